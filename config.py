@@ -0,0 +1,18 @@
+from functools import lru_cache
+from pathlib import Path
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+# Application settings, read from the environment and the .env file next to this module
+class Settings(BaseSettings):
+    groq_api_key: str = Field(min_length=1)
+    secret_key: str = Field(min_length=1)
+
+    model_config = SettingsConfigDict(env_file=Path(__file__).with_name(".env"), extra="ignore")
+
+
+# Parse the settings once per process and reuse them everywhere
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
@@ -1,73 +1,102 @@
-from llama_cpp import Llama
 from fastapi import HTTPException
-import os
-import re
-from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage
-import asyncio
+import httpx
+from async_lru import alru_cache
+from config import get_settings
 
-# Load environment variables from .env file
-load_dotenv()
+# Shared HTTP/2 client so concurrent Groq calls multiplex over kept-alive connections
+groq_http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    timeout=30.0,
+)
 
-# Set the Groq API key from environment variables
-groq_api_key = os.getenv("GROQ_API_KEY")
-if not groq_api_key:
-    raise ValueError("GROQ_API_KEY must be set in the environment variables.")
-os.environ['GROQ_API_KEY'] = groq_api_key
+# Initialize the ChatGroq instance once so its HTTP connection pool is reused across requests
+llm = ChatGroq(
+    model="llama-3.2-90b-text-preview",
+    api_key=get_settings().groq_api_key,
+    max_retries=2,
+    timeout=30,
+    http_async_client=groq_http_client,
+)
 
-# Initialize the ChatGroq instance
-llm = ChatGroq(model="llama-3.2-90b-text-preview")
-
-# Asynchronous function to invoke LLM
-async def invoke_llm(messages):
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, llm.invoke, messages)
-
-# Function to generate a book summary using Llama3
-async def generate_book_summary(book, book_content):
-    messages = [
-        SystemMessage(content="""Summarize the following book in 70 to 100 words: Title, Author, Publish Year, Genre, and book content are provided. 
+# System prompts are constant, so the messages are built once at import and
+# only the HumanMessage is created per request.
+# Keep each prompt byte-for-byte stable and always first in the message list:
+# the provider can then reuse its cached prefix for the leading tokens, and any
+# edit (including whitespace) invalidates that cache. Put everything that varies
+# per request in the HumanMessage.
+_BOOK_SYS = SystemMessage(content="""Summarize the following book in 70 to 100 words: Title, Author, Publish Year, Genre, and book content are provided. 
                                 Generate a summary based solely on the provided content; do not use any prior knowledge. 
                                 Avoid including unrelated information. 
                                 Don't add sentences like 'Here is a 70-100 word summary of the book'
                                 Stick to the given instructions.
-                                If the Book Content is too short to summarize, return "NONE"."""),
+                                If the Book Content is too short to summarize, return "NONE".""")
+
+_REVIEW_SYS = SystemMessage(content="Provide a concise summary of the main points and sentiments expressed in the review.")
+
+_REC_SYS = SystemMessage(content="""Recommend books to the user based on their interest; only provide a list of 10 books separated by ';'.
+                                Ensure there are no extra spaces or non-printable characters in the output.
+                                Example:
+                                    Sapiens: A Brief History of Humankind; The History of the Ancient World; The Guns of August 
+                                    ; A People's History of the United States; The Wright Brothers; The Diary of a Young Girl 
+                                    ; Team of Rivals: The Political Genius of Abraham Lincoln; The Silk Roads: A New History of the World 
+                                    ; The Immortal Life of Henrietta Lacks; The Splendid and the Vile""")
+
+# Asynchronous generator streaming LLM tokens as they are produced
+async def stream_llm(messages):
+    async for chunk in llm.astream(messages):
+        if chunk.content:
+            yield chunk.content
+
+# Function to generate a book summary using Llama3, streamed token by token
+async def generate_book_summary(book, book_content):
+    messages = [
+        _BOOK_SYS,
         HumanMessage(content=f"Title: {book.title}, Author: {book.author}, Publish Year: {book.year_published}, Genre: {book.genre}, Book Content: {book_content}")
     ]
 
-    # Invoke the Llama3 model for book summary generation
-    result = await invoke_llm(messages)
-    if "NONE" in result.content:
+    # Stream the Llama3 model output, buffering only the leading tokens needed
+    # to detect the "NONE" short-circuit before anything is sent to the client
+    tokens = stream_llm(messages)
+    first = ""
+    async for token in tokens:
+        first += token
+        if len(first.strip()) >= len("NONE"):
+            break
+    if "NONE" in first:
+        await tokens.aclose()
         raise HTTPException(status_code=400, detail="Please provide enough book content to generate a summary.")
 
-    return result.content
+    async def token_iter():
+        yield first
+        async for token in tokens:
+            yield token
+
+    return token_iter()
 
-# Function to generate a review summary using Llama3
+# Function to generate a review summary using Llama3, cached per exact review text
+@alru_cache(maxsize=1024, ttl=3600)
 async def generate_review_summary(review_text):
     messages = [
-        SystemMessage(content="Provide a concise summary of the main points and sentiments expressed in the review."),
+        _REVIEW_SYS,
         HumanMessage(content=f"{review_text}")
     ]
 
     # Invoke the Llama3 model for review summary generation
-    result = await invoke_llm(messages)
+    result = await llm.ainvoke(messages)
     return result.content
 
-# Function to recommend books based on user's interested genre
+# Function to recommend books based on user's interested genre, cached per genre
+@alru_cache(maxsize=128, ttl=3600)
 async def recommend_books(interested_genre):
     messages = [
-        SystemMessage(content="""Recommend books to the user based on their interest; only provide a list of 10 books separated by ';'.
-                                Ensure there are no extra spaces or non-printable characters in the output.
-                                Example:
-                                    Sapiens: A Brief History of Humankind; The History of the Ancient World; The Guns of August 
-                                    ; A People's History of the United States; The Wright Brothers; The Diary of a Young Girl 
-                                    ; Team of Rivals: The Political Genius of Abraham Lincoln; The Silk Roads: A New History of the World 
-                                    ; The Immortal Life of Henrietta Lacks; The Splendid and the Vile"""),
+        _REC_SYS,
         HumanMessage(content=f"User is interested in {interested_genre} genre.")
     ]
 
     # Invoke the Llama3 model for book recommendations
-    result = await invoke_llm(messages)
-    result = re.sub(r'[\s]+', ' ', result.content)
-    return [title.strip() for title in result.split(';')] 
+    result = await llm.ainvoke(messages)
+    cleaned = ' '.join(result.content.split())
+    return [title.strip() for title in cleaned.split(';') if title.strip()]
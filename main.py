@@ -1,30 +1,55 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import insert, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from models import Book, Review, User, async_session, init_db
 from llama3_model import generate_book_summary, recommend_books
 from typing import List, Dict, Union, Optional
-from passlib.context import CryptContext
+import bcrypt
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
-from pydantic import BaseModel, Field
+import jwt
+from jwt import InvalidTokenError
+from datetime import timedelta
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from models import Genre, Role
-import os
+from config import get_settings
+from cachetools import TLRUCache, TTLCache
+import asyncio
+import hashlib
+import orjson
+import time
 
-# FastAPI app instance
-app = FastAPI()
+# FastAPI app instance, serializing responses with orjson
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Security and hashing configurations
-SECRET_KEY = os.getenv("SECRET_KEY")
-if SECRET_KEY is None:
-    raise ValueError("SECRET_KEY must be set in the environment variables.")
+SECRET_KEY = get_settings().secret_key
+SECRET_KEY_BYTES = SECRET_KEY.encode()
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Upper bound on the page size accepted by list endpoints
+MAX_PAGE_SIZE = 100
+
+# PostgreSQL SQLSTATE raised when a foreign key target does not exist
+FOREIGN_KEY_VIOLATION = "23503"
+
+# bcrypt cost factor for new hashes (~100 ms per hash on current hardware).
+# Existing hashes keep verifying with the cost they were created with.
+BCRYPT_ROUNDS = 10
+
+# bcrypt only uses the first 72 bytes of a password; passlib truncated silently
+# and existing hashes were created that way
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+# Short-lived cache of bcrypt verification results, keyed by a digest of the
+# plain and hashed password. It is process-local and lost on restart, so each
+# worker pays the full bcrypt cost once per credential pair every 60 seconds.
+_pw_cache = TTLCache(maxsize=1024, ttl=60)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
@@ -35,8 +60,7 @@ class UserCreate(BaseModel):
     interested_genre: Genre
     role: Role
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 
@@ -47,8 +71,7 @@ class UserSchema(BaseModel):
     interested_genre: Genre
     role: Role
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
         
 
 class BookSchema(BaseModel):
@@ -59,6 +82,17 @@ class BookSchema(BaseModel):
     year_published: int
     summary: str
 
+    model_config = ConfigDict(from_attributes=True)
+
+class BookListSchema(BaseModel):
+    id: int
+    title: str
+    author: str
+    genre: Genre
+    year_published: int
+
+    model_config = ConfigDict(from_attributes=True)
+
 class BookCreateSchema(BaseModel):
     title: str
     author: str
@@ -66,8 +100,7 @@ class BookCreateSchema(BaseModel):
     year_published: int
     summary: Optional[str] = Field(default='')
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ReviewSchema(BaseModel):
     book_id: int
@@ -75,6 +108,8 @@ class ReviewSchema(BaseModel):
     review_text: str
     rating: int
 
+    model_config = ConfigDict(from_attributes=True)
+
 class ReviewCreateSchema(BaseModel):
     review_text: str
     rating: int
@@ -83,6 +118,13 @@ class ReviewCreateSchema(BaseModel):
 class BookContent(BaseModel):
     book_content : str
 
+
+# Validators for list responses, built once at import and reused across requests.
+# List endpoints return their output directly (response_model=None), so FastAPI
+# does not validate every row a second time.
+_books_adapter = TypeAdapter(List[BookListSchema])
+_reviews_adapter = TypeAdapter(List[ReviewSchema])
+
 # Dependency for DB session
 async def get_db():
     async with async_session() as session:
@@ -94,6 +136,47 @@ async def on_startup():
     await init_db()
 
 
+# Short-lived cache of authenticated users keyed by user_id, so a burst of
+# protected calls from the same user costs a single database lookup. Users are
+# never updated through the API, so expiry alone keeps entries fresh enough.
+# Entries are expunged from the session that loaded them: a rollback in that
+# session would otherwise expire the shared instance and break later requests.
+_user_cache: TTLCache[int, User] = TTLCache(maxsize=10_000, ttl=30)
+
+# Cache of validated JWT payloads keyed by a digest of the token. Entries live for
+# at most JWT_CACHE_TTL seconds and never past the token's own exp claim; failed
+# validations are never stored.
+JWT_CACHE_TTL = 5
+
+def _jwt_cache_expiry(key, payload, now):
+    return min(now + JWT_CACHE_TTL, payload["exp"])
+
+_jwt_cache = TLRUCache(maxsize=10_000, ttu=_jwt_cache_expiry, timer=time.time)
+
+# PyJWT decoder that parses the claims with orjson instead of the stdlib json module
+class _ORJSONPyJWT(jwt.PyJWT):
+    def _decode_payload(self, decoded: dict) -> dict:
+        try:
+            payload = orjson.loads(decoded["payload"])
+        except orjson.JSONDecodeError as e:
+            raise jwt.DecodeError(f"Invalid payload string: {e}") from e
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError("Invalid payload string: must be a json object")
+        return payload
+
+_jwt_decoder = _ORJSONPyJWT()
+
+def decode_token(token: str) -> dict:
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = _jwt_cache.get(key)
+    if payload is None:
+        payload = _jwt_decoder.decode(
+            token, SECRET_KEY_BYTES, algorithms=[ALGORITHM], options={"require": ["exp", "user_id"]}
+        )
+        _jwt_cache[key] = payload
+    return payload
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=401,
@@ -102,19 +185,19 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     )
     try:
         # Decode the JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("user_id")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        user_id: int = decode_token(token)["user_id"]
+    except InvalidTokenError:
         raise credentials_exception
     
-    # Fetch the user from the database using the user_id
-    result = await db.execute(select(User).filter(User.id == user_id))
-    user = result.scalar()
-
+    # Fetch the user from the cache, falling back to a primary-key lookup
+    user = _user_cache.get(user_id)
     if user is None:
-        raise credentials_exception
+        user = await db.get(User, user_id)
+        if user is None:
+            raise credentials_exception
+        # Detach the fully loaded user so no session commit or rollback can expire it
+        db.expunge(user)
+        _user_cache[user_id] = user
     # Return the user (or user_id if you need just the ID)
     return user  # You can also return user.id if that's all you need
 
@@ -123,22 +206,34 @@ async def require_admin(current_user: User = Depends(get_current_user)):
     if current_user.role != Role.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access is required")
 
-# Password utility functions
-def get_password_hash(password):
-    return pwd_context.hash(password)
+# bcrypt primitives, called directly rather than through passlib
+def _bcrypt_hash(password):
+    password_bytes = password.encode()[:BCRYPT_MAX_PASSWORD_BYTES]
+    return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+def _bcrypt_verify(plain_password, hashed_password):
+    password_bytes = plain_password.encode()[:BCRYPT_MAX_PASSWORD_BYTES]
+    return bcrypt.checkpw(password_bytes, hashed_password.encode())
+
+# Password utility functions, run in a worker thread so bcrypt does not block the event loop
+async def get_password_hash(password):
+    return await asyncio.to_thread(_bcrypt_hash, password)
+
+async def verify_password(plain_password, hashed_password):
+    key = hashlib.sha256((plain_password + hashed_password).encode()).digest()
+    verified = _pw_cache.get(key)
+    if verified is None:
+        verified = await asyncio.to_thread(_bcrypt_verify, plain_password, hashed_password)
+        _pw_cache[key] = verified
+    return verified
 
 # Token creation utility
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # exp is a NumericDate, so compute it directly as epoch seconds
+    ttl_seconds = expires_delta.total_seconds() if expires_delta else 15 * 60
+    to_encode.update({"exp": int(time.time() + ttl_seconds)})
+    return jwt.encode(to_encode, SECRET_KEY_BYTES, algorithm=ALGORITHM)
 
 # User registration endpoint
 @app.post("/users", response_model=UserSchema)
@@ -171,17 +266,23 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)) -> U
     if existing_user.scalar() is not None:
         raise HTTPException(status_code=400, detail="Username or email already registered")
 
-    hashed_password = get_password_hash(user.password)
-    new_user = User(
+    hashed_password = await get_password_hash(user.password)
+
+    # Insert the user and get the generated ID back in the same round-trip
+    stmt = insert(User).values(
         username=user.username,
         email=user.email,
         password=hashed_password,
         interested_genre=user.interested_genre,
         role=user.role
-    )
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
+    ).returning(User)
+    try:
+        new_user = (await db.execute(stmt)).scalar_one()
+        await db.commit()
+    except IntegrityError:
+        # Another registration claimed the username or email after the check above
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Username or email already registered")
     return new_user
 
 
@@ -213,7 +314,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
     """
     result = await db.execute(select(User).where(User.username == form_data.username))
     user = result.scalar()
-    if not user or not verify_password(form_data.password, user.password):
+    if not user or not await verify_password(form_data.password, user.password):
         raise HTTPException(status_code=400, detail="Incorrect username or password")
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(data={"user_id": user.id, "sub": user.username}, expires_delta=access_token_expires)
@@ -222,20 +323,16 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
 
 # To get current user
 @app.get("/users/whoami", response_model=UserSchema)
-async def whoami(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> UserSchema:
+async def whoami(current_user: User = Depends(get_current_user)) -> UserSchema:
     """
     Get current user information.
 
-    This endpoint retrieves the details of the currently authenticated user based on the 
-    provided access token. It decodes the token to extract the username, checks the 
-    validity of the token, and fetches the corresponding user from the database. If 
-    the token is invalid or if the user does not exist, an HTTP 401 error is raised.
+    This endpoint returns the details of the currently authenticated user. The access token 
+    is validated and the user is resolved once by the get_current_user dependency; if the 
+    token is invalid or the user does not exist, an HTTP 401 error is raised there.
 
     Args:
-        token (str): The Bearer token used for authentication. It is automatically 
-                     provided via dependency injection from the OAuth2 scheme.
-        db (AsyncSession, optional): The database session for performing database operations. 
-                                     It is automatically injected via dependency injection.
+        current_user (User): The currently logged-in user, automatically injected.
 
     Raises:
         HTTPException: If the credentials are invalid (either the token is not valid or the 
@@ -246,26 +343,15 @@ async def whoami(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends
         UserSchema: The details of the currently authenticated user, represented as an 
                      instance of the UserSchema.
     """
-    credentials_exception = HTTPException(
-        status_code=401,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalar()
-    if user is None:
-        raise credentials_exception
-    return user
+    return current_user
 
-@app.post("/books", response_model=BookSchema, dependencies=[Depends(get_current_user)])
-async def add_book(book: BookCreateSchema, db: AsyncSession = Depends(get_db)) -> Book:
+@app.post(
+    "/books",
+    response_model=None,
+    responses={200: {"model": BookSchema}},
+    dependencies=[Depends(get_current_user)]
+    )
+async def add_book(book: BookCreateSchema, db: AsyncSession = Depends(get_db)) -> dict:
     """
     Add a new book to the collection.
 
@@ -284,32 +370,36 @@ async def add_book(book: BookCreateSchema, db: AsyncSession = Depends(get_db)) -
                        status code 400 and a detailed message is raised.
 
     Returns:
-        Book: The newly created book object.
+        dict: The newly created book, serialized according to the BookSchema.
     """
-    # Check if the book with the same title and author already exists
-    existing_book = await db.execute(select(Book).filter(
-        (Book.title == book.title) & (Book.author == book.author)
-    ))
-    if existing_book.scalar() is not None:
+    # Insert the book, letting the unique (title, author) constraint reject duplicates
+    stmt = (
+        pg_insert(Book)
+        .values(**book.model_dump())
+        .on_conflict_do_nothing(index_elements=[Book.title, Book.author])
+        .returning(Book)
+    )
+    new_book = (await db.execute(stmt)).scalar_one_or_none()
+    if new_book is None:
         raise HTTPException(status_code=400, detail="Book with the same title and author already exists")
-
-    # Create a new book
-    new_book = Book(**book.model_dump())
-    db.add(new_book)
     await db.commit()
-    await db.refresh(new_book)
-    return new_book
+    return BookSchema.model_validate(new_book).model_dump(mode="json")
 
 
-@app.put("/books/{id}", response_model=BookSchema, dependencies=[Depends(get_current_user)])
-async def update_book(id: int, book: BookCreateSchema, db: AsyncSession = Depends(get_db)) -> Book:
+@app.put(
+    "/books/{id}",
+    response_model=None,
+    responses={200: {"model": BookSchema}},
+    dependencies=[Depends(get_current_user)]
+    )
+async def update_book(id: int, book: BookCreateSchema, db: AsyncSession = Depends(get_db)) -> dict:
     """
     Update an existing book's details.
 
     This endpoint allows users to update the information of a specific book by its ID. 
-    It first fetches the book from the database; if the book does not exist, it raises a 
-    404 error. If the book is found, it updates its attributes with the provided new data 
-    and commits the changes to the database.
+    It updates the book's columns with the fields provided in the request in a single 
+    statement; fields left out of the request, such as the summary, keep their current 
+    value. If the book does not exist, it raises a 404 error.
 
     Args:
         id (int): The ID of the book to be updated.
@@ -318,53 +408,78 @@ async def update_book(id: int, book: BookCreateSchema, db: AsyncSession = Depend
                                      It is automatically injected via dependency injection.
 
     Raises:
-        HTTPException: If the book with the given ID is not found, an error with status code 
-                       404 and a detailed message is raised.
+        HTTPException: 
+            - If the book with the given ID is not found, an error with status code 404 and a detailed message is raised.
+            - If another book already has the same title and author, a 400 error is raised with a detailed message.
 
     Returns:
-        Book: The updated book object.
+        dict: The updated book, serialized according to the BookSchema.
     """
-    # Fetch the book by ID
-    existing_book = await db.get(Book, id)
-    
-    if not existing_book:
-        raise HTTPException(status_code=404, detail="Book not found")
-
-    # Update the book with new data
-    for key, value in book.model_dump().items():
-        setattr(existing_book, key, value)
-
-    # Save the changes to the database
-    db.add(existing_book)
-    await db.commit()
-    await db.refresh(existing_book)
+    # Update the book with the fields provided and read it back in the same statement
+    stmt = (
+        update(Book)
+        .where(Book.id == id)
+        .values(**book.model_dump(exclude_unset=True))
+        .returning(Book)
+    )
+    try:
+        existing_book = (await db.execute(stmt)).scalar_one_or_none()
+        if existing_book is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+        await db.commit()
+    except IntegrityError:
+        # Safe for the user cache: the authenticated user is detached, so the rollback cannot expire it
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Book with the same title and author already exists")
     
-    return existing_book
+    return BookSchema.model_validate(existing_book).model_dump(mode="json")
 
 
-@app.get("/books", response_model=List[BookSchema],dependencies=[Depends(get_current_user)])
-async def get_books(db: AsyncSession = Depends(get_db)) -> List[BookSchema]:
+@app.get(
+    "/books",
+    response_model=None,
+    responses={200: {"model": List[BookListSchema]}},
+    dependencies=[Depends(get_current_user)]
+    )
+async def get_books(
+    limit: int = Query(default=50, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(default=0, ge=0),
+    db: AsyncSession = Depends(get_db)
+    ) -> List[dict]:
     """
-    Retrieve a list of all books.
+    Retrieve a page of books.
 
-    This endpoint fetches all the books from the database and returns them in a list. 
-    It requires the user to be authenticated. The returned list contains details of each book, 
-    structured according to the BookSchema.
+    This endpoint fetches books from the database, ordered by ID, and returns them in a list. 
+    It requires the user to be authenticated. Results are paginated with `limit` and `offset`, 
+    and the returned list contains details of each book, structured according to the BookListSchema. 
+    Summaries are left out of the list view; use GET /books/{id} to fetch a book's summary.
 
     Args:
+        limit (int, optional): The maximum number of books to return, between 1 and MAX_PAGE_SIZE. Defaults to 50.
+        offset (int, optional): The number of books to skip before collecting results. Defaults to 0.
         db (AsyncSession, optional): The database session for performing the database operations. 
                                      It is automatically injected via dependency injection.
 
     Returns:
-        List[BookSchema]: A list of books, each represented by the BookSchema.
+        List[BookListSchema]: A list of books, each represented by the BookListSchema.
     """
-    result = await db.execute(select(Book))
-    books = result.scalars().all()
-    return books
+    result = await db.execute(
+        select(Book.id, Book.title, Book.author, Book.genre, Book.year_published)
+        .order_by(Book.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    books = result.all()
+    return _books_adapter.dump_python(_books_adapter.validate_python(books), mode="json")
 
 
-@app.get("/books/{id}", response_model=BookSchema, dependencies=[Depends(get_current_user)])
-async def get_book(id: int, db: AsyncSession = Depends(get_db)) -> Book:
+@app.get(
+    "/books/{id}",
+    response_model=None,
+    responses={200: {"model": BookSchema}},
+    dependencies=[Depends(get_current_user)]
+    )
+async def get_book(id: int, db: AsyncSession = Depends(get_db)) -> dict:
     """
     Retrieve a specific book by its ID.
 
@@ -380,13 +495,12 @@ async def get_book(id: int, db: AsyncSession = Depends(get_db)) -> Book:
         HTTPException: If no book with the specified ID is found, a 404 error is raised with a detailed message.
 
     Returns:
-        BookSchema: The details of the book represented by the BookSchema.
+        dict: The details of the book, serialized according to the BookSchema.
     """
-    result = await db.execute(select(Book).where(Book.id == id))
-    book = result.scalar()
+    book = await db.get(Book, id)
     if book is None:
         raise HTTPException(status_code=404, detail="Book not found")
-    return book
+    return BookSchema.model_validate(book).model_dump(mode="json")
 
 
 @app.delete("/books/{id}", response_model=BookSchema, dependencies=[Depends(get_current_user)])
@@ -452,32 +566,32 @@ async def add_review(
     Returns:
         ReviewSchema: The details of the newly created review represented by the ReviewSchema.
     """
-    # Check if the book exists
-    result = await db.execute(select(Book).filter(Book.id == id))
-    book = result.scalar()
-
-    if book is None:
-        raise HTTPException(status_code=404, detail="Book not found")
-
-    # Check if the user has already reviewed this book
-    existing_review = await db.execute(
-        select(Review).filter(Review.book_id == id, Review.user_id == current_user.id)
-    )
-    if existing_review.scalar() is not None:
-        raise HTTPException(status_code=400, detail="You can only rate a book once.")
-
     # assign the user ID from the current logged-in user
     new_review = Review(user_id=current_user.id, book_id=id, **review.model_dump())
     db.add(new_review)
-    await db.commit()
-    await db.refresh(new_review)
+
+    # Let the database check that the book exists and that the user has not
+    # already reviewed it, instead of querying for both before inserting
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        # Safe for the user cache: current_user is detached, so the rollback cannot expire it
+        await db.rollback()
+        if getattr(e.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION:
+            raise HTTPException(status_code=404, detail="Book not found")
+        raise HTTPException(status_code=400, detail="You can only rate a book once.")
     
     return new_review
 
 
 
-@app.get("/books/{id}/reviews", response_model=List[ReviewSchema],dependencies=[Depends(get_current_user)])
-async def get_reviews(id: int, db: AsyncSession = Depends(get_db)) -> List[ReviewSchema]:
+@app.get(
+    "/books/{id}/reviews",
+    response_model=None,
+    responses={200: {"model": List[ReviewSchema]}},
+    dependencies=[Depends(get_current_user)]
+    )
+async def get_reviews(id: int, db: AsyncSession = Depends(get_db)) -> List[dict]:
     """
     Retrieve all reviews for a specific book.
 
@@ -500,7 +614,7 @@ async def get_reviews(id: int, db: AsyncSession = Depends(get_db)) -> List[Revie
     """
     result = await db.execute(select(Review).where(Review.book_id == id))
     reviews = result.scalars().all()
-    return reviews
+    return _reviews_adapter.dump_python(_reviews_adapter.validate_python(reviews), mode="json")
 
 @app.get("/books/{book_id}/summary", dependencies=[Depends(get_current_user)])
 async def get_book_summary(book_id: int, db: AsyncSession = Depends(get_db)) -> Dict[str, Union[str, float]]:
@@ -524,39 +638,40 @@ async def get_book_summary(book_id: int, db: AsyncSession = Depends(get_db)) ->
         Dict: A dictionary containing the book summary and the average rating. 
                                        The average rating will be "NA" if no reviews are available.
     """
-    # Fetch the book by ID
-    book_result = await db.execute(select(Book).where(Book.id == book_id))
-    book = book_result.scalar()
+    # Fetch the book summary together with its rounded average rating in a single query
+    stmt = (
+        select(Book.summary, func.round(func.avg(Review.rating), 2).label("average_rating"))
+        .outerjoin(Review, Review.book_id == Book.id)
+        .where(Book.id == book_id)
+        .group_by(Book.id)
+    )
+    row = (await db.execute(stmt)).one_or_none()
 
-    if not book:
+    if row is None:
         raise HTTPException(status_code=404, detail="Book not found")
-    
-    # Fetch all reviews related to the book
-    review_result = await db.execute(select(Review).where(Review.book_id == book_id))
-    reviews = review_result.scalars().all()
 
-    # Calculate the average rating if reviews exist
-    if reviews:
-        total_rating = sum(review.rating for review in reviews)
-        average_rating = round(total_rating / len(reviews), 2)
-    else:
-        average_rating = "NA"
+    # AVG is NULL when the book has no reviews. ROUND on numeric rounds halves away
+    # from zero (an exact 2.125 gives 2.13), unlike Python's round() on a float.
+    average_rating = float(row.average_rating) if row.average_rating is not None else "NA"
 
     # Return the summary and average rating
     return {
-        "summary": book.summary,
+        "summary": row.summary,
         "average_rating": average_rating
     }
 
 
 @app.post("/books/{id}/generate-summary", dependencies=[Depends(get_current_user),Depends(require_admin)])
-async def generate_summary(id: int, book_content: BookContent, db: AsyncSession = Depends(get_db)) -> Dict[str, str]:
+async def generate_summary(id: int, book_content: BookContent, db: AsyncSession = Depends(get_db)) -> StreamingResponse:
     """
     Generate a summary for a specific book based on provided content using LLM.
 
     This endpoint allows authenticated admin users to generate a summary for a book identified by its 
     ID. It retrieves the book from the database, uses the provided content along with the Llama3 model 
-    to generate a summary, updates the book's summary in the database, and returns the updated summary.
+    to generate a summary, and streams the summary back token by token as it is produced. Once the 
+    stream completes, the full summary is stored as the book's summary in the database, unless the 
+    model answered "NONE" after streaming started. If the client disconnects before the stream 
+    completes, the book's summary is left unchanged.
 
     Args:
         id (int): The unique identifier of the book for which the summary is to be generated.
@@ -570,27 +685,40 @@ async def generate_summary(id: int, book_content: BookContent, db: AsyncSession
             - If the provided book content is too short to summarize, a 400 error is raised with a detailed message.
 
     Returns:
-        Dict[str, str]: A dictionary containing the updated summary of the book generated by the LLM.
+        StreamingResponse: A plain-text stream of the summary generated by the LLM.
     """
     # Retrieve the book by its ID
-    result = await db.execute(select(Book).where(Book.id == id))
-    book = result.scalar()
+    book = await db.get(Book, id)
 
     # If the book does not exist, raise an exception
     if book is None:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    # Generate the summary for the given content
-    summary = await generate_book_summary(book,book_content)
-
-    # Update the book's summary in the database
-    book.summary = summary
-    db.add(book)
-    await db.commit()
-    await db.refresh(book)
-
-    # Return the updated summary
-    return {"summary": book.summary}
+    # Start generating the summary for the given content
+    tokens = await generate_book_summary(book,book_content)
+
+    async def summary_stream():
+        chunks = []
+        async for token in tokens:
+            chunks.append(token)
+            yield token
+
+        # Only the leading tokens were checked before streaming started, so re-check the
+        # full text and keep the stored summary if the model still answered "NONE"
+        summary = "".join(chunks)
+        if "NONE" in summary:
+            return
+
+        # Update the book's summary once the full text is known. A fresh session is
+        # used because the request-scoped one may already be closed while streaming.
+        # If the client disconnects mid-stream this point is never reached, so a
+        # partial summary is never saved.
+        async with async_session() as session:
+            await session.execute(update(Book).where(Book.id == id).values(summary=summary))
+            await session.commit()
+
+    # Forward tokens to the client as they are produced
+    return StreamingResponse(summary_stream(), media_type="text/plain")
 
 
 @app.get("/recommendations", dependencies=[Depends(get_current_user)])